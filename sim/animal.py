@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 import random
 
+import numpy as np
+
 
 from sim.base import BDIAgent
 from sim.cell import Cell
@@ -20,6 +22,49 @@ DIRECTIONS = {
     "RIGHT": (0, 1)
 }
 
+# Direction names in a fixed order, so a random direction is a 2-bit index
+DIR_NAMES = tuple(DIRECTIONS)
+
+# Generator for decisions of animals on a cell outside any ecosystem
+_RNG = np.random.default_rng()
+
+# Species tags
+PREY = 0
+PREDATOR = 1
+
+# Occupancy bits identifying the species present in a cell
+PREY_BIT = 1
+PREDATOR_BIT = 2
+
+# Perception indices (1 + dr, 1 + dc) of each direction, in DIRECTIONS order
+DIR_ROWS = np.array([1 + dr for dr, _ in DIRECTIONS.values()])
+DIR_COLS = np.array([1 + dc for _, dc in DIRECTIONS.values()])
+
+# Weight of each direction in a 4-bit direction mask, in DIRECTIONS order
+DIR_BITS = 1 << np.arange(len(DIRECTIONS))
+
+# Names of the directions set in each 4-bit direction mask, in DIRECTIONS order
+DIRS_BY_MASK = tuple(
+    tuple(name for i, name in enumerate(DIR_NAMES) if mask >> i & 1)
+    for mask in range(1 << len(DIRECTIONS))
+)
+
+# Range of the integers drawn for batched direction choices. It is divisible by
+# every possible number of choices (1 to 4), so draw % k picks one of k uniformly.
+DIR_DRAWS = 12
+
+# Layout of one perceived cell. A perception is a (3, 3) array of these,
+# indexed by [1 + dr, 1 + dc]; terrain_kind is ROCK or SOIL, occ_bits is the OR
+# of the occupants' occupancy bits, and cells outside the grid read as rock with
+# cell_id -1.
+PERCEPTION_DTYPE = np.dtype([
+    ("terrain_kind", np.int8),
+    ("grass", np.float64),
+    ("n_occ", np.int8),
+    ("cell_id", np.int32),
+    ("occ_bits", np.uint8),
+])
+
 
 class Animal:
     """
@@ -34,8 +79,16 @@ class Animal:
         eat_efficiency (float): Efficiency in consuming food
         reproduction_threshold (float): Energy level required for reproduction
         reproduction_cost (float): Energy cost for reproduction
+        kind (int): Species tag (PREY or PREDATOR; None for the base class)
+        occupancy_bit (int): Bit set in a cell's occupancy bits while this animal is there
     """
     
+    __slots__ = ("position", "alive", "energy", "max_energy", "move_cost",
+                 "eat_efficiency", "reproduction_threshold", "reproduction_cost", "_perc")
+    
+    kind = None
+    occupancy_bit = 0
+    
     def __init__(self, position: Cell = None):
         self.position = position
         self.alive = True
@@ -45,67 +98,89 @@ class Animal:
         self.eat_efficiency = 0.7
         self.reproduction_threshold = 80.0
         self.reproduction_cost = 40.0
+        self._perc = None  # perception buffer, allocated by the first see()
         
-    def see(self, grid: list[list[Cell]]) -> dict:
+    def see(self, env) -> np.ndarray:
         """
         Generate perception of the environment based on the agent's position.
         
         Args:
-            grid: The ecosystem grid
+            env: The ecosystem the animal lives in
             
         Returns:
-            Dictionary containing perceived information about the environment
+            (3, 3) record array of PERCEPTION_DTYPE centered on the current cell,
+            or None if the animal is dead or not placed. The array is owned by the
+            animal and is overwritten by the next call to see().
         """
-        if not self.position or not self.alive:
-            return {}
+        position = self.position
+        if position is None or position.row is None or not self.alive:
+            return None
         
-        # Find current position in grid
-        current_row, current_col = None, None
-        for r, row in enumerate(grid):
-            for c, cell in enumerate(row):
-                if cell is self.position:
-                    current_row, current_col = r, c
-                    break
-            if current_row is not None:
-                break
-                
-        if current_row is None:
-            return {}
+        # Batched simulation steps never call see(), so most animals never need the buffer
+        perc = self._perc
+        if perc is None:
+            perc = self._perc = np.empty((3, 3), dtype=PERCEPTION_DTYPE)
         
         # Perceive immediate neighborhood (3x3 area centered on current cell)
-        perception = {
-            "current_cell": self.position,
-            "neighbors": {},
-            "self_energy": self.energy
-        }
-        
-        for dr in (-1, 0, 1):
-            for dc in (-1, 0, 1):
-                r, c = current_row + dr, current_col + dc
-                if 0 <= r < len(grid) and 0 <= c < len(grid[0]):
-                    neighbor = grid[r][c]
-                    perception["neighbors"][(dr, dc)] = {
-                        "cell": neighbor,
-                        "terrain": neighbor.terrain_type,
-                        "grass": neighbor.grass_amount if neighbor.is_fertile() else 0.0,
-                        "occupants": neighbor.get_occupants()
-                    }
-                    
-        return perception
+        env.gather_perception(perc, position.row, position.col)
+        return perc
     
-    def action(self, perception: dict) -> tuple[int, tuple]:
+    def action(self, perception: np.ndarray) -> tuple[int, tuple]:
         """
         Base action decision method. To be overridden by subclasses.
         
+        The default policy is stateless: it ignores the perception and the
+        animal's state and moves in a uniformly random direction. A driver can
+        therefore draw the directions for a whole batch of such animals at once
+        (e.g. rng.integers(0, 4, size=n) indexing DIR_NAMES) instead of calling it.
+        
         Args:
-            perception: Dictionary containing environmental information
+            perception: Perception record array returned by see()
             
         Returns:
             Tuple: (action_id, arguments)
         """
         # Default behavior: move randomly if possible
-        possible_dirs = list(DIRECTIONS.keys())
-        return (MOVE, (random.choice(possible_dirs),))
+        return (MOVE, (DIR_NAMES[random.getrandbits(2)],))
+    
+    @classmethod
+    def decide(cls, animals: list["Animal"], perceptions: np.ndarray,
+               rng: np.random.Generator) -> list[tuple[int, tuple]]:
+        """
+        Decide the actions of a batch of animals of this class.
+        
+        The default calls action() on each animal in turn. Subclasses with their
+        own rules implement them here instead, over the whole batch with array
+        operations, drawing their random choices for the batch from `rng` at once
+        (integers in [0, DIR_DRAWS), one per animal); their action() then decides
+        a batch of one through decide_alone(), so both paths share one
+        implementation.
+        
+        Args:
+            animals: Living, placed animals of this class
+            perceptions: (N, 3, 3) perception records; entry i belongs to animals[i]
+            rng: Random generator for the batch's random choices
+            
+        Returns:
+            List of (action_id, arguments), one per animal
+        """
+        return [animal.action(perception) for animal, perception in zip(animals, perceptions)]
+    
+    def decide_alone(self, perception: np.ndarray) -> tuple[int, tuple]:
+        """
+        Decide this animal's action through its class's decide(), as a batch of one.
+        
+        Random choices are drawn from the ecosystem's generator.
+        
+        Args:
+            perception: Perception record array returned by see()
+            
+        Returns:
+            Tuple: (action_id, arguments)
+        """
+        eco = self.position.ecosystem if self.position is not None else None
+        rng = eco.rng if eco is not None else _RNG
+        return type(self).decide([self], perception[np.newaxis], rng)[0]
     
     def move(self, direction: str) -> bool:
         """
@@ -123,31 +198,23 @@ class Animal:
         if self.position is None:
             return False
             
-        # Find current position in ecosystem grid
-        current_row, current_col = None, None
-        for r, row in enumerate(self.position.map_reference):
-            for c, cell in enumerate(row):
-                if cell is self.position:
-                    current_row, current_col = r, c
-                    break
-            if current_row is not None:
-                break
-                
-        if current_row is None:
+        # Current position is cached on the cell itself
+        current_id = self.position.id
+        if current_id is None:
             return False
             
         # Calculate new position
         dx, dy = DIRECTIONS[direction]
-        new_row, new_col = current_row + dx, current_col + dy
+        new_row, new_col = self.position.row + dx, self.position.col + dy
         
         # Check if new position is valid
-        if (0 <= new_row < len(self.position.map_reference) and 
-            0 <= new_col < len(self.position.map_reference[0])):
+        eco = self.position.ecosystem
+        if 0 <= new_row < eco.rows and 0 <= new_col < eco.cols:
             
-            new_cell = self.position.map_reference[new_row][new_col]
+            new_cell = eco.cells_flat[current_id + dx * eco.cols + dy]
             
             # Can only move to soil cells that aren't full
-            if new_cell.terrain_type == "rock" or not new_cell.can_add_animal():
+            if not new_cell.is_fertile() or not new_cell.can_add_animal():
                 return False
                 
             # Move to new cell
@@ -168,28 +235,30 @@ class Animal:
         # Base method - to be overridden by subclasses
         return 0.0
         
-    def reproduce(self) -> bool:
+    def reproduce(self) -> "Animal | None":
         """
-        Attempt to reproduce. Returns True if successful.
+        Attempt to reproduce. Returns the offspring if successful.
         
         Returns:
-            True if reproduction was successful, False otherwise
+            The new offspring (placed in the current cell) if reproduction was
+            successful, None otherwise
         """
         if (not self.alive or 
             self.energy < self.reproduction_threshold or 
             self.position is None or 
             not self.position.can_add_animal()):
-            return False
+            return None
             
         # Create offspring
         offspring = self.__class__(self.position)
         offspring.energy = self.energy / 2
         self.energy -= self.reproduction_cost
         
-        # Add offspring to current cell
-        return self.position.add_animal(offspring)
+        # Add offspring to current cell (room was checked above)
+        self.position.add_animal(offspring)
+        return offspring
     
-    def step(self, perception: dict) -> tuple[bool, list]:
+    def step(self, perception: np.ndarray) -> tuple[bool, list]:
         """
         Execute one step of the animal's lifecycle.
         
@@ -218,9 +287,10 @@ class Animal:
         elif action_id == EAT:
             self.eat()
         elif action_id == REPRODUCE:
-            if self.reproduce():
+            offspring = self.reproduce()
+            if offspring is not None:
                 # Offspring added to cell, but we need to return it for tracking
-                new_offspring = [self.position.occupants[-1]]
+                new_offspring = [offspring]
                 
         return (self.alive, new_offspring)
 
@@ -137,12 +137,10 @@ class BDIAgent(Agent):
         Belief Revision Function (brf): Updates the agent's beliefs.
 
         Given a new perception and the current set of beliefs, this function determines a new set of beliefs.
+        It updates self.beliefs in place, so only the beliefs that changed need to be touched.
 
         Args:
             perception: The agent's perception of the environment.
-
-        Returns:
-            list: The updated set of beliefs.
         """
         pass
     
@@ -153,9 +151,7 @@ class BDIAgent(Agent):
 
         Based on the current beliefs and intentions, this function determines the set of possible desires (options) available to the agent.
         It is responsible for planning and must ensure that generated options are consistent with the agent's beliefs and intentions, and can opportunistically adapt to changes in the environment.
-
-        Returns:
-            list: The set of possible desires.
+        It updates self.desires in place.
         """
         pass
     
@@ -166,9 +162,7 @@ class BDIAgent(Agent):
 
         Represents the agent's deliberation process, selecting which desires become intentions, based on current beliefs, desires, and intentions.
         Ensures that intentions are valid, beneficial, and consistent, and may add new intentions or remove obsolete ones.
-
-        Returns:
-            list: The updated set of intentions.
+        It updates self.intentions in place.
         """
         pass
     
@@ -198,7 +192,7 @@ class BDIAgent(Agent):
         Returns:
             Any: The action to be performed.
         """
-        self.beliefs = self.beliefs_revision(perception)
-        self.desires = self.generate_options()
-        self.intentions = self.filter()
+        self.beliefs_revision(perception)
+        self.generate_options()
+        self.filter()
         return self.execute()
\ No newline at end of file
@@ -1,3 +1,13 @@
+from copy import deepcopy
+
+import numpy as np
+
+
+# Terrain kinds, as stored in the ecosystem's terrain array
+ROCK = 0
+SOIL = 1
+
+
 class Cell:
     """
     Represents a single cell in the predator-prey environment grid.
@@ -6,9 +16,26 @@ class Cell:
         terrain_type (str): Either "rock" (infertile) or "soil" (fertile).
         grass_amount (float): Amount of grass currently available (only if terrain_type == "soil").
         occupants (List[Animal]): List of Animal instances occupying this cell (max length = 2).
+        row (int): Row index of this cell in the ecosystem grid (None if not placed in a grid).
+        col (int): Column index of this cell in the ecosystem grid (None if not placed in a grid).
+        ecosystem (Ecosystem): The ecosystem whose grid this cell belongs to (None if not placed in a grid).
+        id (int): Index of this cell in the ecosystem's flat grid, row * cols + col
+            (None if not placed in a grid).
+
+    Notes:
+        - Cells compare and hash by identity. Use id when an integer key is needed
+          (e.g. to match perception cell ids or to key per-step bookkeeping).
+        - When the cell belongs to an Ecosystem, grass_amount is a view over the
+          ecosystem's shared grass array, so the whole grid can be updated at once.
+          The number of occupants is likewise mirrored into the ecosystem's
+          occ_count array, and the species present (the OR of the occupants'
+          occupancy_bit) into its occ_bits array.
     """
 
-    def __init__(self, terrain_type: str = "soil", initial_grass: float = 1.0):
+    __slots__ = ("terrain_type", "occupants", "ecosystem", "row", "col", "id", "_terrain_int", "_grass", "_occ_count", "_occ_bits", "_index")
+
+    def __init__(self, terrain_type: str = "soil", initial_grass: float = 1.0,
+                 row: int = None, col: int = None, ecosystem=None):
         """
         Initialize a Cell.
 
@@ -17,21 +44,91 @@ class Cell:
                 - "rock": infertile; grass_amount is always 0.
                 - "soil": fertile; grass can grow and be eaten.
             initial_grass (float): Starting grass amount (only used if terrain_type == "soil").
+            row (int): Row index of this cell in the ecosystem grid.
+            col (int): Column index of this cell in the ecosystem grid.
+            ecosystem (Ecosystem): Ecosystem whose grass and occupancy arrays back this cell.
+                If None, the cell keeps them in private arrays.
         """
         terrain_type = terrain_type.lower()
         if terrain_type not in {"rock", "soil"}:
             raise ValueError(f"Unsupported terrain_type '{terrain_type}'. Must be 'rock' or 'soil'.")
 
         self.terrain_type: str = terrain_type
-        self.grass_amount: float = initial_grass if terrain_type == "soil" else 0.0
+        self._terrain_int = SOIL if terrain_type == "soil" else ROCK
         self.occupants = []
+        self.row = row
+        self.col = col
+        self.ecosystem = ecosystem
+
+        if ecosystem is None:
+            self.id = None
+            self._grass = np.zeros((1, 1))
+            self._occ_count = np.zeros((1, 1), dtype=np.int8)
+            self._occ_bits = np.zeros((1, 1), dtype=np.uint8)
+            self._index = (0, 0)
+        else:
+            self.id = row * ecosystem.cols + col
+            self._grass = ecosystem.grass
+            self._occ_count = ecosystem.occ_count
+            self._occ_bits = ecosystem.occ_bits
+            self._index = (row, col)
+        self.grass_amount = initial_grass if terrain_type == "soil" else 0.0
+
+    @classmethod
+    def build_grid(cls, ecosystem) -> tuple:
+        """
+        Bulk-construct every cell of an ecosystem's grid.
+
+        Equivalent to calling Cell(...) once per grid position, but skips
+        argument validation and per-cell grass writes: terrain is read from
+        ecosystem.terrain, and ecosystem.grass must already hold the initial grass.
+
+        Args:
+            ecosystem (Ecosystem): Ecosystem whose arrays back the cells.
+
+        Returns:
+            Tuple[Cell]: All cells in row-major order, so that cells[cell.id] is cell.
+        """
+        new = object.__new__
+        grass, occ_count, occ_bits = ecosystem.grass, ecosystem.occ_count, ecosystem.occ_bits
+        cells = []
+        cell_id = 0
+        for r, terrain_row in enumerate(ecosystem.terrain.tolist()):
+            for c, terrain_int in enumerate(terrain_row):
+                cell = new(cls)
+                cell.terrain_type = "soil" if terrain_int == SOIL else "rock"
+                cell._terrain_int = terrain_int
+                cell.occupants = []
+                cell.row = r
+                cell.col = c
+                cell.id = cell_id
+                cell.ecosystem = ecosystem
+                cell._grass = grass
+                cell._occ_count = occ_count
+                cell._occ_bits = occ_bits
+                cell._index = (r, c)
+                cells.append(cell)
+                cell_id += 1
+        return tuple(cells)
+
+    @property
+    def grass_amount(self) -> float:
+        """
+        Returns:
+            float: Amount of grass currently available in this cell.
+        """
+        return self._grass.item(self._index)
+
+    @grass_amount.setter
+    def grass_amount(self, value: float) -> None:
+        self._grass[self._index] = value
 
     def is_fertile(self) -> bool:
         """
         Returns:
             bool: True if this cell is fertile ("soil"), False otherwise.
         """
-        return self.terrain_type == "soil"
+        return self._terrain_int == SOIL
 
     def has_grass(self) -> bool:
         """
@@ -88,6 +185,14 @@ class Cell:
         """
         return list(self.occupants)
 
+    def view_occupants(self) -> list:
+        """
+        Returns:
+            List[Animal]: The live list of occupants in this cell (not a copy).
+                Callers must not modify it, nor keep it across moves.
+        """
+        return self.occupants
+
     def can_add_animal(self) -> bool:
         """
         Returns:
@@ -113,6 +218,8 @@ class Cell:
             return False
 
         self.occupants.append(animal)
+        self._occ_count[self._index] += 1
+        self._occ_bits[self._index] |= animal.occupancy_bit
         animal.position = self  # The Animal must have a 'position' attribute referring to this Cell.
         return True
 
@@ -125,10 +232,20 @@ class Cell:
         
         Side Effects:
             - If the animal was present, removes it from occupants and sets animal.position = None.
+
+        Notes:
+            - Occupants are matched by identity, not equality.
         """
-        if animal in self.occupants:
-            self.occupants.remove(animal)
-            animal.position = None
+        for i, occupant in enumerate(self.occupants):
+            if occupant is animal:
+                del self.occupants[i]
+                self._occ_count[self._index] -= 1
+                bits = 0
+                for other in self.occupants:
+                    bits |= other.occupancy_bit
+                self._occ_bits[self._index] = bits
+                animal.position = None
+                return
 
     def clear_occupants(self) -> None:
         """
@@ -140,6 +257,30 @@ class Cell:
         for animal in self.occupants:
             animal.position = None
         self.occupants.clear()
+        self._occ_count[self._index] = 0
+        self._occ_bits[self._index] = 0
+
+    def __deepcopy__(self, memo: dict) -> "Cell":
+        """
+        Copy this cell's terrain, grass and occupants, detached from its ecosystem.
+
+        The copy keeps its own private arrays (like a Cell built without an
+        ecosystem), so snapshotting a grid does not copy the whole Ecosystem.
+        row, col and id are kept to identify the original cell.
+
+        Args:
+            memo (dict): deepcopy's memo of already copied objects.
+
+        Returns:
+            Cell: The detached copy.
+        """
+        cell = Cell(self.terrain_type, self.grass_amount, self.row, self.col)
+        memo[id(self)] = cell
+        cell.id = self.id
+        cell._occ_count[cell._index] = self._occ_count[self._index]
+        cell._occ_bits[cell._index] = self._occ_bits[self._index]
+        cell.occupants = deepcopy(self.occupants, memo)
+        return cell
 
     def __repr__(self) -> str:
         """
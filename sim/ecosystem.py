@@ -1,10 +1,9 @@
-import random
+import numpy as np
 
 from sim.base import Environment
-from sim.cell import Cell
-from sim.animal import Animal
-from sim.predator import Predator
-from sim.prey import Prey    
+from sim.cell import Cell, ROCK, SOIL
+from sim.kernels import regrow, gather_perception, gather_perceptions
+from sim.animal import Animal, PERCEPTION_DTYPE, PREDATOR, PREY
 
 # Constants for actions
 MOVE = 0
@@ -20,36 +19,108 @@ DIRECTIONS = {
 }
 
 
+def _handle_move(animal: Animal, args: tuple) -> tuple[bool, list]:
+    """Apply a MOVE action; args is (direction,)."""
+    animal.move(args[0])
+    return (animal.alive, [])
+
+
+def _handle_eat(animal: Animal, args: tuple) -> tuple[bool, list]:
+    """Apply an EAT action; args is (prey,) for predators and () for prey."""
+    # Predator eating requires a prey argument
+    if animal.kind == PREDATOR and len(args) > 0 and args[0].kind == PREY:
+        animal.eat(args[0])
+    else:
+        animal.eat()
+    return (animal.alive, [])
+
+
+def _handle_reproduce(animal: Animal, args: tuple) -> tuple[bool, list]:
+    """Apply a REPRODUCE action; args is ()."""
+    offspring = animal.reproduce()
+    if offspring is not None:
+        return (animal.alive, [offspring])
+    return (animal.alive, [])
+
+
+# Action handlers, indexed by action id
+_HANDLERS = (_handle_move, _handle_eat, _handle_reproduce)
+
+
 class Ecosystem(Environment):
     """
     Manages the environment grid and animal interactions.
     
     Attributes:
-        map (List[List[Cell]]): 2D grid of cells
+        cells_flat (Tuple[Cell]): All cells in row-major order, indexed by cell id (row * cols + col)
+        map (List[Tuple[Cell]]): 2D grid of cells (rows of cells_flat)
         size (int): Grid size
+        rows (int): Number of rows in the grid
+        cols (int): Number of columns in the grid
         grass_regrowth_rate (float): Amount of grass regrown per step
+        max_grass (float): Maximum amount of grass a cell can hold
+        rng (np.random.Generator): Random generator used to build the grid (seed may
+            be an int or an existing Generator, which is then used as is)
+        grass (np.ndarray): Grass amount of every cell, indexed by (row, col)
+        terrain (np.ndarray): Terrain kind (ROCK or SOIL) of every cell, indexed by (row, col)
+        fertile (np.ndarray): Boolean mask of soil cells, indexed by (row, col)
+        cell_ids (np.ndarray): Id of every cell (row * cols + col), indexed by (row, col)
+        occ_count (np.ndarray): Number of animals in every cell, indexed by (row, col)
+        occ_bits (np.ndarray): Species present in every cell (PREY_BIT | PREDATOR_BIT), indexed by (row, col)
+
+    Notes:
+        - The grid arrays are views into arrays padded by one cell on every side
+          (rock, no grass, id -1, empty), so 3x3 windows around any cell can be
+          sliced without bounds checks.
     """
     
     def __init__(self, size: int, 
                  grass_regrowth_rate: float = 0.1,
-                 rock_density: float = 0.2):
+                 rock_density: float = 0.2,
+                 max_grass: float = np.inf,
+                 seed: int | np.random.Generator = None):
         
         self.size = size
+        self.rows = size
+        self.cols = size
         self.grass_regrowth_rate = grass_regrowth_rate
+        self.max_grass = max_grass
+        self.rng = np.random.default_rng(seed)
+        
+        padded_shape = (size + 2, size + 2)
+        self._grass_padded = np.zeros(padded_shape)
+        self._terrain_padded = np.full(padded_shape, ROCK, dtype=np.int8)
+        self._fertile_padded = np.zeros(padded_shape, dtype=bool)
+        self._cell_ids_padded = np.full(padded_shape, -1, dtype=np.int32)
+        self._occ_count_padded = np.zeros(padded_shape, dtype=np.int8)
+        self._occ_bits_padded = np.zeros(padded_shape, dtype=np.uint8)
+        self.grass = self._grass_padded[1:-1, 1:-1]
+        self.terrain = self._terrain_padded[1:-1, 1:-1]
+        self.fertile = self._fertile_padded[1:-1, 1:-1]
+        self.cell_ids = self._cell_ids_padded[1:-1, 1:-1]
+        self.occ_count = self._occ_count_padded[1:-1, 1:-1]
+        self.occ_bits = self._occ_bits_padded[1:-1, 1:-1]
+        self.cell_ids[:] = np.arange(size * size).reshape(size, size)
+        self._perceptions = np.empty((0, 3, 3), dtype=PERCEPTION_DTYPE)
         
-        # Initialize grid
-        self.map = []
-        for _ in range(size):
-            row = []
-            for _ in range(size):
-                # Randomly place rocks
-                if random.random() < rock_density:
-                    cell = Cell("rock")
-                else:
-                    cell = Cell("soil", initial_grass=random.uniform(0.5, 1.0))
-                cell.map_reference = self.map  # Give cells access to the grid
-                row.append(cell)
-            self.map.append(row)
+        # Randomly place rocks and initial grass, drawn for the whole grid at once
+        rocks = self.rng.random((size, size)) < rock_density
+        initial_grass = self.rng.uniform(0.5, 1.0, (size, size))
+        self.terrain[:] = np.where(rocks, ROCK, SOIL)
+        self.grass[:] = np.where(rocks, 0.0, initial_grass)
+        np.equal(self._terrain_padded, SOIL, out=self._fertile_padded)
+        
+        # Initialize grid as a flat, row-major tuple of cells over those arrays
+        self.cells_flat = Cell.build_grid(self)
+        self._map = [self.cells_flat[r * size:(r + 1) * size] for r in range(size)]
+    
+    @property
+    def map(self) -> list[tuple[Cell]]:
+        """
+        Returns:
+            List[Tuple[Cell]]: The grid as rows of cells, for map[row][col] access.
+        """
+        return self._map
     
     def transform(self, animal: Animal, action: tuple[int, tuple]) -> tuple[bool, list]:
         """
@@ -63,36 +134,53 @@ class Ecosystem(Environment):
             Tuple: (alive_status, new_offspring)
         """
         action, args = action
-        
-
-        if action == MOVE:
-            direction = args[0]
-            animal.move(direction)
-            return (animal.alive, [])
-            
-        elif action == EAT:
-            # Predator eating requires a prey argument
-            if isinstance(animal, Predator) and len(args) > 0 and isinstance(args[0], Prey):
-                energy_gained = animal.eat(args[0])
-                return (animal.alive, [])
-            else:
-                energy_gained = animal.eat()
-                return (animal.alive, [])
-                
-        elif action == REPRODUCE:
-            success = animal.reproduce()
-            if success:
-                # Return the last added occupant as offspring
-                return (animal.alive, [animal.position.occupants[-1]])
-            return (animal.alive, [])
-            
+        if 0 <= action < len(_HANDLERS):
+            return _HANDLERS[action](animal, args)
         return (animal.alive, [])
     
     def regenerate_grass(self):
         """
-        Regenerate grass in all soil cells.
+        Regenerate grass in all soil cells, up to max_grass.
+        """
+        regrow(self._grass_padded, self._fertile_padded, self.grass_regrowth_rate, self.max_grass)
+
+    def gather_perception(self, out, row: int, col: int) -> None:
+        """
+        Fill a perception record with the 3x3 neighborhood centered on (row, col).
+
+        Args:
+            out (np.ndarray): (3, 3) record array to fill in place.
+            row (int): Row of the center cell.
+            col (int): Column of the center cell.
+        """
+        gather_perception(out, self._grass_padded, self._terrain_padded,
+                          self._cell_ids_padded, self._occ_count_padded,
+                          self._occ_bits_padded, row, col)
+
+    def perceive(self, animals: list[Animal]) -> np.ndarray:
+        """
+        Gather the perceptions of a batch of animals in one pass.
+
+        Equivalent to calling see() on every animal, but the 3x3 windows are
+        read from the grid arrays in a single vectorized gather.
+
+        Args:
+            animals: Placed animals to perceive for
+
+        Returns:
+            (N, 3, 3) record array of PERCEPTION_DTYPE; entry i is the
+            perception of animals[i]. The array is a view into a buffer owned by
+            the ecosystem and is overwritten by the next call to perceive().
         """
-        for row in self.map:
-            for cell in row:
-                if cell.terrain_type == "soil":
-                    cell.regenerate_grass(self.grass_regrowth_rate)
\ No newline at end of file
+        n = len(animals)
+        rows = np.fromiter((a.position.row for a in animals), dtype=np.intp, count=n)
+        cols = np.fromiter((a.position.col for a in animals), dtype=np.intp, count=n)
+        if self._perceptions.shape[0] < n:
+            # Grow geometrically so a growing population reallocates rarely
+            self._perceptions = np.empty((max(n, 2 * self._perceptions.shape[0]), 3, 3),
+                                         dtype=PERCEPTION_DTYPE)
+        out = self._perceptions[:n]
+        gather_perceptions(out, self._grass_padded, self._terrain_padded,
+                           self._cell_ids_padded, self._occ_count_padded,
+                           self._occ_bits_padded, rows, cols)
+        return out
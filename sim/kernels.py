@@ -0,0 +1,284 @@
+"""
+Compiled kernels for the per-step numeric work of the simulation.
+
+The kernels are compiled with Numba when it is installed. Otherwise equivalent
+NumPy/Python implementations with the same signatures are used, so Numba stays
+an optional dependency.
+
+Setting the environment variable AIVOLUTION_DISABLE_NUMBA (to anything but "0")
+selects the NumPy implementations even when Numba is installed. Loading Numba
+and the cached kernels takes a few tenths of a second, which dominates short
+runs on small grids.
+"""
+
+import os
+
+import numpy as np
+
+from sim.cell import SOIL
+from sim.animal import DIR_BITS, DIR_COLS, DIR_ROWS, PREY_BIT
+
+if os.environ.get("AIVOLUTION_DISABLE_NUMBA", "0") != "0":
+    HAVE_NUMBA = False
+else:
+    try:
+        from numba import njit, prange
+        HAVE_NUMBA = True
+    except ImportError:
+        HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def regrow(grass, fertile, rate, cap):
+        """
+        Regrow grass in place on every fertile cell, capping it at `cap`.
+
+        Args:
+            grass (np.ndarray): 2D float array of grass amounts (modified in place).
+            fertile (np.ndarray): 2D boolean mask of fertile cells.
+            rate (float): Amount of grass added per fertile cell.
+            cap (float): Maximum amount of grass a cell can hold.
+        """
+        H, W = grass.shape
+        for i in prange(H):
+            for j in range(W):
+                if fertile[i, j]:
+                    g = grass[i, j] + rate
+                    grass[i, j] = g if g < cap else cap
+
+    @njit(cache=True)
+    def gather_perception(out, grass, terrain, cell_ids, occ_count, occ_bits, r, c):
+        """
+        Fill a perception record with the 3x3 neighborhood centered on a cell.
+
+        The input arrays are padded by one cell on every side, so the window
+        never falls outside them and no bounds checks are needed.
+
+        Args:
+            out (np.ndarray): (3, 3) record array to fill in place (see animal.PERCEPTION_DTYPE).
+            grass (np.ndarray): Padded 2D float array of grass amounts.
+            terrain (np.ndarray): Padded 2D int8 array of terrain kinds.
+            cell_ids (np.ndarray): Padded 2D int array of cell ids (-1 outside the grid).
+            occ_count (np.ndarray): Padded 2D int array of occupant counts.
+            occ_bits (np.ndarray): Padded 2D uint8 array of species bits present.
+            r (int): Row of the center cell in grid coordinates.
+            c (int): Column of the center cell in grid coordinates.
+        """
+        for i in range(3):
+            for j in range(3):
+                t = terrain[r + i, c + j]
+                rec = out[i, j]
+                rec.terrain_kind = t
+                rec.grass = grass[r + i, c + j] if t == SOIL else 0.0
+                rec.cell_id = cell_ids[r + i, c + j]
+                rec.n_occ = occ_count[r + i, c + j]
+                rec.occ_bits = occ_bits[r + i, c + j]
+
+    @njit(parallel=True, cache=True)
+    def gather_perceptions(out, grass, terrain, cell_ids, occ_count, occ_bits, rows, cols):
+        """
+        Fill the perception records of a whole batch of cells at once.
+
+        Args:
+            out (np.ndarray): (N, 3, 3) record array to fill in place.
+            grass (np.ndarray): Padded 2D float array of grass amounts.
+            terrain (np.ndarray): Padded 2D int8 array of terrain kinds.
+            cell_ids (np.ndarray): Padded 2D int array of cell ids (-1 outside the grid).
+            occ_count (np.ndarray): Padded 2D int array of occupant counts.
+            occ_bits (np.ndarray): Padded 2D uint8 array of species bits present.
+            rows (np.ndarray): Row of each center cell in grid coordinates.
+            cols (np.ndarray): Column of each center cell in grid coordinates.
+        """
+        for n in prange(rows.shape[0]):
+            gather_perception(out[n], grass, terrain, cell_ids, occ_count, occ_bits,
+                              rows[n], cols[n])
+
+    @njit(parallel=True, cache=True)
+    def prey_rules(terrain, n_occ, grass, energy, max_energy, threshold, draws,
+                   escape, seek, eats, breeds):
+        """
+        Evaluate the Prey decision rules for a batch of perceptions.
+
+        Directions are indices into DIRECTIONS order. The escape direction is
+        drawn uniformly among the open ones: draws[n] % count picks a set bit of
+        the 4-bit mask of open directions.
+
+        Args:
+            terrain (np.ndarray): (N, 3, 3) perceived terrain kinds.
+            n_occ (np.ndarray): (N, 3, 3) perceived occupant counts.
+            grass (np.ndarray): (N, 3, 3) perceived grass amounts.
+            energy (np.ndarray): (N,) energy of each animal.
+            max_energy (np.ndarray): (N,) maximum energy of each animal.
+            threshold (np.ndarray): (N,) reproduction threshold of each animal.
+            draws (np.ndarray): (N,) random integers in [0, DIR_DRAWS).
+            escape (np.ndarray): (N,) output: random open direction, or -1 if none.
+            seek (np.ndarray): (N,) output: first open direction with grass > 0.5, or -1.
+            eats (np.ndarray): (N,) boolean output: hungry and standing on grass.
+            breeds (np.ndarray): (N,) boolean output: can reproduce in place.
+        """
+        n_dirs = DIR_ROWS.shape[0]
+        for n in prange(terrain.shape[0]):
+            mask = 0
+            count = 0
+            first_grassy = -1
+            for k in range(n_dirs):
+                i = DIR_ROWS[k]
+                j = DIR_COLS[k]
+                if terrain[n, i, j] == SOIL and n_occ[n, i, j] < 2:
+                    mask |= DIR_BITS[k]
+                    count += 1
+                    if first_grassy < 0 and grass[n, i, j] > 0.5:
+                        first_grassy = k
+            # Index of the (draws[n] % count)-th set bit of the mask
+            chosen = -1
+            if count:
+                pick = draws[n] % count
+                for k in range(n_dirs):
+                    if mask & DIR_BITS[k]:
+                        if pick == 0:
+                            chosen = k
+                            break
+                        pick -= 1
+            escape[n] = chosen
+            seek[n] = first_grassy
+            eats[n] = energy[n] < max_energy[n] * 0.7 and grass[n, 1, 1] > 0.0
+            breeds[n] = energy[n] >= threshold[n] and n_occ[n, 1, 1] < 2
+
+    @njit(parallel=True, cache=True)
+    def predator_rules(occ_bits, n_occ, energy, threshold, prey_here, prey_dirs, breeds):
+        """
+        Evaluate the Predator decision rules for a batch of perceptions.
+
+        Args:
+            occ_bits (np.ndarray): (N, 3, 3) perceived occupancy bits.
+            n_occ (np.ndarray): (N, 3, 3) perceived occupant counts.
+            energy (np.ndarray): (N,) energy of each animal.
+            threshold (np.ndarray): (N,) reproduction threshold of each animal.
+            prey_here (np.ndarray): (N,) boolean output: prey in the animal's own cell.
+            prey_dirs (np.ndarray): (N,) output: 4-bit mask of directions with prey.
+            breeds (np.ndarray): (N,) boolean output: can reproduce in place.
+        """
+        for n in prange(occ_bits.shape[0]):
+            p = 0
+            for k in range(DIR_ROWS.shape[0]):
+                if occ_bits[n, DIR_ROWS[k], DIR_COLS[k]] & PREY_BIT:
+                    p |= DIR_BITS[k]
+            prey_dirs[n] = p
+            prey_here[n] = (occ_bits[n, 1, 1] & PREY_BIT) != 0
+            breeds[n] = energy[n] >= threshold[n] and n_occ[n, 1, 1] < 2
+
+else:
+
+    def regrow(grass, fertile, rate, cap):
+        """
+        Regrow grass in place on every fertile cell, capping it at `cap`.
+
+        Args:
+            grass (np.ndarray): 2D float array of grass amounts (modified in place).
+            fertile (np.ndarray): 2D boolean mask of fertile cells.
+            rate (float): Amount of grass added per fertile cell.
+            cap (float): Maximum amount of grass a cell can hold.
+        """
+        np.add(grass, rate, out=grass, where=fertile)
+        if cap < np.inf:
+            # No clamp pass for the default, uncapped grass
+            np.minimum(grass, cap, out=grass, where=fertile)
+
+    def gather_perception(out, grass, terrain, cell_ids, occ_count, occ_bits, r, c):
+        """
+        Fill a perception record with the 3x3 neighborhood centered on a cell.
+
+        The input arrays are padded by one cell on every side, so the window
+        never falls outside them and no bounds checks are needed.
+
+        Args:
+            out (np.ndarray): (3, 3) record array to fill in place (see animal.PERCEPTION_DTYPE).
+            grass (np.ndarray): Padded 2D float array of grass amounts.
+            terrain (np.ndarray): Padded 2D int8 array of terrain kinds.
+            cell_ids (np.ndarray): Padded 2D int array of cell ids (-1 outside the grid).
+            occ_count (np.ndarray): Padded 2D int array of occupant counts.
+            occ_bits (np.ndarray): Padded 2D uint8 array of species bits present.
+            r (int): Row of the center cell in grid coordinates.
+            c (int): Column of the center cell in grid coordinates.
+        """
+        window = terrain[r:r + 3, c:c + 3]
+        out["terrain_kind"] = window
+        np.multiply(grass[r:r + 3, c:c + 3], window == SOIL, out=out["grass"])
+        out["cell_id"] = cell_ids[r:r + 3, c:c + 3]
+        out["n_occ"] = occ_count[r:r + 3, c:c + 3]
+        out["occ_bits"] = occ_bits[r:r + 3, c:c + 3]
+
+    def gather_perceptions(out, grass, terrain, cell_ids, occ_count, occ_bits, rows, cols):
+        """
+        Fill the perception records of a whole batch of cells at once.
+
+        Args:
+            out (np.ndarray): (N, 3, 3) record array to fill in place.
+            grass (np.ndarray): Padded 2D float array of grass amounts.
+            terrain (np.ndarray): Padded 2D int8 array of terrain kinds.
+            cell_ids (np.ndarray): Padded 2D int array of cell ids (-1 outside the grid).
+            occ_count (np.ndarray): Padded 2D int array of occupant counts.
+            occ_bits (np.ndarray): Padded 2D uint8 array of species bits present.
+            rows (np.ndarray): Row of each center cell in grid coordinates.
+            cols (np.ndarray): Column of each center cell in grid coordinates.
+        """
+        r = rows[:, None, None] + np.arange(3)[:, None]
+        c = cols[:, None, None] + np.arange(3)
+        window = terrain[r, c]
+        out["terrain_kind"] = window
+        np.multiply(grass[r, c], window == SOIL, out=out["grass"])
+        out["cell_id"] = cell_ids[r, c]
+        out["n_occ"] = occ_count[r, c]
+        out["occ_bits"] = occ_bits[r, c]
+
+    def prey_rules(terrain, n_occ, grass, energy, max_energy, threshold, draws,
+                   escape, seek, eats, breeds):
+        """
+        Evaluate the Prey decision rules for a batch of perceptions.
+
+        Directions are indices into DIRECTIONS order. The escape direction is
+        drawn uniformly among the open ones: draws[n] % count picks a set bit of
+        the 4-bit mask of open directions.
+
+        Args:
+            terrain (np.ndarray): (N, 3, 3) perceived terrain kinds.
+            n_occ (np.ndarray): (N, 3, 3) perceived occupant counts.
+            grass (np.ndarray): (N, 3, 3) perceived grass amounts.
+            energy (np.ndarray): (N,) energy of each animal.
+            max_energy (np.ndarray): (N,) maximum energy of each animal.
+            threshold (np.ndarray): (N,) reproduction threshold of each animal.
+            draws (np.ndarray): (N,) random integers in [0, DIR_DRAWS).
+            escape (np.ndarray): (N,) output: random open direction, or -1 if none.
+            seek (np.ndarray): (N,) output: first open direction with grass > 0.5, or -1.
+            eats (np.ndarray): (N,) boolean output: hungry and standing on grass.
+            breeds (np.ndarray): (N,) boolean output: can reproduce in place.
+        """
+        open_dirs = (terrain[:, DIR_ROWS, DIR_COLS] == SOIL) & (n_occ[:, DIR_ROWS, DIR_COLS] < 2)
+        count = open_dirs.sum(axis=1)
+        pick = draws % np.maximum(count, 1)
+        # Index of the pick-th open direction: the first whose running count exceeds pick
+        chosen = np.argmax(np.cumsum(open_dirs, axis=1) > pick[:, None], axis=1)
+        escape[:] = np.where(count > 0, chosen, -1)
+        grassy = open_dirs & (grass[:, DIR_ROWS, DIR_COLS] > 0.5)
+        seek[:] = np.where(grassy.any(axis=1), np.argmax(grassy, axis=1), -1)
+        eats[:] = (energy < max_energy * 0.7) & (grass[:, 1, 1] > 0.0)
+        breeds[:] = (energy >= threshold) & (n_occ[:, 1, 1] < 2)
+
+    def predator_rules(occ_bits, n_occ, energy, threshold, prey_here, prey_dirs, breeds):
+        """
+        Evaluate the Predator decision rules for a batch of perceptions.
+
+        Args:
+            occ_bits (np.ndarray): (N, 3, 3) perceived occupancy bits.
+            n_occ (np.ndarray): (N, 3, 3) perceived occupant counts.
+            energy (np.ndarray): (N,) energy of each animal.
+            threshold (np.ndarray): (N,) reproduction threshold of each animal.
+            prey_here (np.ndarray): (N,) boolean output: prey in the animal's own cell.
+            prey_dirs (np.ndarray): (N,) output: 4-bit mask of directions with prey.
+            breeds (np.ndarray): (N,) boolean output: can reproduce in place.
+        """
+        prey_dirs[:] = ((occ_bits[:, DIR_ROWS, DIR_COLS] & PREY_BIT) != 0) @ DIR_BITS
+        prey_here[:] = (occ_bits[:, 1, 1] & PREY_BIT) != 0
+        breeds[:] = (energy >= threshold) & (n_occ[:, 1, 1] < 2)
@@ -1,7 +1,8 @@
-import random
+import numpy as np
 
 from sim.cell import Cell
-from sim.animal import Animal
+from sim.animal import Animal, DIR_DRAWS, DIR_NAMES, DIRS_BY_MASK, PREDATOR, PREDATOR_BIT, PREY
+from sim.kernels import predator_rules
 from sim.prey import Prey
 
 
@@ -10,19 +11,24 @@ MOVE = 0
 EAT = 1
 REPRODUCE = 2
 
-# Directions for movement
-DIRECTIONS = {
-    "UP": (-1, 0),
-    "DOWN": (1, 0),
-    "LEFT": (0, -1),
-    "RIGHT": (0, 1)
-}
+
+def _find_prey(cell: Cell) -> Prey | None:
+    """Return the first living prey in a cell, or None."""
+    for occupant in cell.view_occupants():
+        if occupant.kind == PREY and occupant.alive:
+            return occupant
+    return None
 
 
 class Predator(Animal):
     """
     Predator animal that hunts prey.
     """
+    __slots__ = ("attack_cost", "attack_damage")
+    
+    kind = PREDATOR
+    occupancy_bit = PREDATOR_BIT
+    
     def __init__(self, position: Cell = None):
         super().__init__(position)
         self.attack_cost = 5.0
@@ -30,55 +36,57 @@ class Predator(Animal):
         self.max_energy = 120.0
         self.reproduction_threshold = 90.0
         
-    def action(self, perception: dict) -> tuple[int, tuple]:
+    def action(self, perception: np.ndarray) -> tuple[int, tuple]:
         """
-        Predator-specific decision making.
+        Predator-specific decision making (see decide()).
         
         Priority:
         1. Hunt prey in current cell
         2. Hunt prey in adjacent cells
-        3. Eat if energy low
-        4. Reproduce if possible
-        5. Move randomly
+        3. Reproduce if possible
+        4. Move randomly
+        
+        Predators chase adjacent prey whatever their energy, so there is no
+        separate rule for hunting when energy is low.
         """
-        # Hunt in current cell
-        current_cell = perception.get("current_cell")
-        if current_cell:
-            for occupant in current_cell.get_occupants():
-                if isinstance(occupant, Prey) and occupant.alive:
-                    return (EAT, (occupant,))
+        return self.decide_alone(perception)
+    
+    @classmethod
+    def decide(cls, animals: list["Predator"], perceptions: np.ndarray,
+               rng: np.random.Generator) -> list[tuple[int, tuple]]:
+        """
+        Predator decision rules, for a whole batch (see Animal.decide).
         
-        # Hunt in adjacent cells
-        prey_dirs = []
-        for (dr, dc), neighbor in perception["neighbors"].items():
-            if any(isinstance(occ, Prey) for occ in neighbor.get("occupants", [])):
-                # Convert vector to direction name
-                for dir_name, vector in DIRECTIONS.items():
-                    if vector == (dr, dc):
-                        prey_dirs.append(dir_name)
-                        break
-                        
-        if prey_dirs:
-            return (MOVE, (random.choice(prey_dirs),))
-            
-        # Eat if energy is low
-        if self.energy < self.max_energy * 0.6:
-            # Look for prey in neighborhood
-            for v, neighbor in perception["neighbors"].items():
-                for occupant in neighbor.get("occupants", []):
-                    if isinstance(occupant, Prey) and occupant.alive:
-                        # Convert vector to direction name
-                        for dir_name, vector in DIRECTIONS.items():
-                            if vector == v:
-                                return (MOVE, (dir_name,))
+        Prey presence is read from the occupancy bits of the whole batch by the
+        predator_rules kernel; only predators sharing a cell with prey look at
+        its occupants.
+        """
+        n = len(animals)
+        energy = np.fromiter((a.energy for a in animals), dtype=float, count=n)
+        threshold = np.fromiter((a.reproduction_threshold for a in animals), dtype=float, count=n)
+        prey_here = np.empty(n, dtype=bool)
+        prey_masks = np.empty(n, dtype=np.int8)
+        breeds = np.empty(n, dtype=bool)
+        predator_rules(perceptions["occ_bits"], perceptions["n_occ"], energy, threshold,
+                       prey_here, prey_masks, breeds)
         
-        # Reproduce if possible
-        if self.energy >= self.reproduction_threshold and self.position.can_add_animal():
-            return (REPRODUCE, ())
-            
-        # Default: move randomly
-        possible_dirs = list(DIRECTIONS.keys())
-        return (MOVE, (random.choice(possible_dirs),))
+        draws = rng.integers(0, DIR_DRAWS, size=n).tolist()
+        
+        actions = []
+        for animal, here, prey_mask, breed, draw in zip(animals, prey_here.tolist(),
+                                                        prey_masks.tolist(), breeds.tolist(),
+                                                        draws):
+            target = _find_prey(animal.position) if here else None
+            if target is not None:
+                actions.append((EAT, (target,)))
+            elif prey_mask:
+                prey_dirs = DIRS_BY_MASK[prey_mask]
+                actions.append((MOVE, (prey_dirs[draw % len(prey_dirs)],)))
+            elif breed:
+                actions.append((REPRODUCE, ()))
+            else:
+                actions.append((MOVE, (DIR_NAMES[draw % len(DIR_NAMES)],)))
+        return actions
         
     def eat(self, prey: Prey) -> float:
         """
@@ -90,7 +98,7 @@ class Predator(Animal):
         Returns:
             Amount of energy gained
         """
-        if not self.alive or not prey.alive or self.position != prey.position:
+        if not self.alive or not prey.alive or self.position is not prey.position:
             return 0.0
             
         # Attack prey
@@ -105,7 +113,8 @@ class Predator(Animal):
             prey.alive = False
             self.position.remove_animal(prey)
             energy_gain = prey.max_energy * self.eat_efficiency
-            self.energy = min(self.energy + energy_gain, self.max_energy)
+            energy = self.energy + energy_gain
+            self.energy = energy if energy < self.max_energy else self.max_energy
             return energy_gain
             
         return 0.0
@@ -1,6 +1,8 @@
-import random
+import numpy as np
 
-from sim.animal import Animal, Cell
+from sim.cell import Cell
+from sim.animal import Animal, DIR_DRAWS, DIR_NAMES, PREY, PREY_BIT
+from sim.kernels import prey_rules
 
 
 # Constants for actions
@@ -8,75 +10,72 @@ MOVE = 0
 EAT = 1
 REPRODUCE = 2
 
-# Directions for movement
-DIRECTIONS = {
-    "UP": (-1, 0),
-    "DOWN": (1, 0),
-    "LEFT": (0, -1),
-    "RIGHT": (0, 1)
-}
-
 
 class Prey(Animal):
     """
     Prey animal that eats grass and avoids predators.
     """
+    __slots__ = ("eat_amount",)
+    
+    kind = PREY
+    occupancy_bit = PREY_BIT
+    
     def __init__(self, position: Cell = None):
         super().__init__(position)
         self.eat_amount = 15.0  # Amount of grass to try to eat in one action
         self.max_energy = 80.0
         self.reproduction_threshold = 60.0
         
-    def action(self, perception: dict) -> tuple[int, tuple]:
+    def action(self, perception: np.ndarray) -> tuple[int, tuple]:
         """
-        Prey-specific decision making.
+        Prey-specific decision making (see decide()).
         
         Priority:
         1. Avoid predators
         2. Eat if hungry
         3. Reproduce if possible
-        4. Move randomly
+        4. Move to grass
+        5. Move randomly
+        """
+        return self.decide_alone(perception)
+    
+    @classmethod
+    def decide(cls, animals: list["Prey"], perceptions: np.ndarray,
+               rng: np.random.Generator) -> list[tuple[int, tuple]]:
         """
-        # Check for predators in current cell
-        current_cell = perception.get("current_cell")
-        if current_cell:
-            for occupant in current_cell.get_occupants():
-                if occupant.alive:
-                    # Try to escape - find safe direction
-                    safe_dirs = []
-                    for dir_name, (dr, dc) in DIRECTIONS.items():
-                        neighbor = perception["neighbors"].get((dr, dc), {})
-                        if (neighbor.get("terrain") == "soil" and neighbor["cell"].can_add_animal()):
-                            safe_dirs.append(dir_name)
-                            
-                    if safe_dirs:
-                        return (MOVE, (random.choice(safe_dirs),))
+        Prey decision rules, for a whole batch (see Animal.decide).
         
-        # Eat if energy is low
-        if self.energy < self.max_energy * 0.7 and current_cell and current_cell.has_grass():
-            return (EAT, ())
+        The rules, including the pick of a random safe direction, are evaluated
+        for the whole batch by the prey_rules kernel. A living prey always
+        shares its cell with a living animal (itself), so it escapes whenever it
+        has a safe direction.
+        """
+        n = len(animals)
+        energy = np.fromiter((a.energy for a in animals), dtype=float, count=n)
+        max_energy = np.fromiter((a.max_energy for a in animals), dtype=float, count=n)
+        threshold = np.fromiter((a.reproduction_threshold for a in animals), dtype=float, count=n)
+        draws = rng.integers(0, DIR_DRAWS, size=n)
+        escape = np.empty(n, dtype=np.int8)
+        seek = np.empty(n, dtype=np.int8)
+        eats = np.empty(n, dtype=bool)
+        breeds = np.empty(n, dtype=bool)
+        prey_rules(perceptions["terrain_kind"], perceptions["n_occ"], perceptions["grass"],
+                   energy, max_energy, threshold, draws, escape, seek, eats, breeds)
         
-        # Reproduce if possible
-        if self.energy >= self.reproduction_threshold and self.position.can_add_animal():
-            return (REPRODUCE, ())
-            
-        # Move to a cell with grass
-        grass_dirs = []
-        for (dr, dc), neighbor in perception["neighbors"].items():
-            if (neighbor["terrain"] == "soil" and 
-                neighbor["grass"] > 0.5 and 
-                neighbor["cell"].can_add_animal()):
-                grass_dirs.append((dr, dc))
-                
-        if grass_dirs:
-            # Convert vector to direction name
-            for dir_name, vector in DIRECTIONS.items():
-                if vector in grass_dirs:
-                    return (MOVE, (dir_name,))
-                    
-        # Default: move randomly
-        possible_dirs = list(DIRECTIONS.keys())
-        return (MOVE, (random.choice(possible_dirs),))
+        actions = []
+        for flee, grassy, eat, breed, draw in zip(escape.tolist(), seek.tolist(), eats.tolist(),
+                                                  breeds.tolist(), draws.tolist()):
+            if flee >= 0:
+                actions.append((MOVE, (DIR_NAMES[flee],)))
+            elif eat:
+                actions.append((EAT, ()))
+            elif breed:
+                actions.append((REPRODUCE, ()))
+            elif grassy >= 0:
+                actions.append((MOVE, (DIR_NAMES[grassy],)))
+            else:
+                actions.append((MOVE, (DIR_NAMES[draw % len(DIR_NAMES)],)))
+        return actions
         
     def eat(self) -> float:
         """
@@ -90,5 +89,6 @@ class Prey(Animal):
             
         consumed = self.position.consume_grass(self.eat_amount)
         energy_gain = consumed * self.eat_efficiency
-        self.energy = min(self.energy + energy_gain, self.max_energy)
+        energy = self.energy + energy_gain
+        self.energy = energy if energy < self.max_energy else self.max_energy
         return energy_gain
\ No newline at end of file
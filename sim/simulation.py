@@ -1,4 +1,4 @@
-import random
+import numpy as np
 
 from sim.ecosystem import Ecosystem
 from sim.prey import Prey
@@ -11,16 +11,23 @@ class Simulation:
     
     Attributes:
         ecosystem (Ecosystem): The environment
-        animals (List[Animal]): All animals in the simulation
+        rng (np.random.Generator): Random generator shared by the ecosystem, the
+            initial placement and the animals' batched decisions, seeded from the
+            `seed` parameter
+        prey (List[Prey]): Living prey, in the order they act
+        predators (List[Predator]): Living predators, in the order they act
+        animals (List[Animal]): Read-only; a new list of all living animals (prey, then predators)
         max_steps (int): Maximum number of steps to run
         current_step (int): Current step number
     """
     
     def __init__(self, size: int = 20, height: int = 20, 
                  initial_prey: int = 20, initial_predators: int = 5,
-                 max_steps: int = 1000, **params):
-        self.ecosystem = Ecosystem(size, **params)
-        self.animals = []
+                 max_steps: int = 1000, seed: int = None, **params):
+        self.rng = np.random.default_rng(seed)
+        self.ecosystem = Ecosystem(size, seed=self.rng, **params)
+        self.prey = []
+        self.predators = []
         self.max_steps = max_steps
         self.current_step = 0
         
@@ -28,69 +35,106 @@ class Simulation:
         self._initialize_animals(initial_prey, initial_predators)
         
     def _initialize_animals(self, prey_count: int, predator_count: int):
-        """Place initial animals in the ecosystem."""
-        # Place prey
-        for _ in range(prey_count):
-            placed = False
-            while not placed:
-                r = random.randint(0, self.ecosystem.size - 1)
-                c = random.randint(0, self.ecosystem.size - 1)
-                cell = self.ecosystem.map[r][c]
-                if cell.terrain_type != "rock" and cell.can_add_animal():
-                    prey = Prey(cell)
-                    cell.add_animal(prey)
-                    self.animals.append(prey)
-                    placed = True
-                    
-        # Place predators
-        for _ in range(predator_count):
-            placed = False
-            while not placed:
-                r = random.randint(0, self.ecosystem.size - 1)
-                c = random.randint(0, self.ecosystem.size - 1)
-                cell = self.ecosystem.map[r][c]
-                if cell.terrain_type != "rock" and cell.can_add_animal():
-                    predator = Predator(cell)
-                    cell.add_animal(predator)
-                    self.animals.append(predator)
-                    placed = True
+        """
+        Place initial animals in the ecosystem.
+        
+        Each animal goes to a cell drawn uniformly among the soil cells that
+        still have room, as if by rejection sampling over the grid, but cells
+        are dropped from the candidates as soon as they fill up, so placement
+        needs no retries.
+        
+        Raises:
+            ValueError: If there are more animals than free places (two per
+                empty soil cell).
+        """
+        eco = self.ecosystem
+        has_room = eco.fertile & (eco.occ_count < 2)
+        free_places = int((2 - eco.occ_count[has_room]).sum())
+        total = prey_count + predator_count
+        if total > free_places:
+            raise ValueError(f"cannot place {total} animals: only {free_places} free places")
+        candidates = eco.cell_ids[has_room].tolist()
+        
+        # Place prey, then predators
+        for i, u in enumerate(self.rng.random(total).tolist()):
+            k = int(u * len(candidates))
+            cell = eco.cells_flat[candidates[k]]
+            if i < prey_count:
+                animal = Prey(cell)
+                self.prey.append(animal)
+            else:
+                animal = Predator(cell)
+                self.predators.append(animal)
+            cell.add_animal(animal)
+            if not cell.can_add_animal():
+                # Swap-remove the full cell from the candidates
+                candidates[k] = candidates[-1]
+                candidates.pop()
+    
+    @property
+    def animals(self) -> list:
+        """
+        Returns:
+            List[Animal]: A read-only copy: a new list of all living animals
+            (prey, then predators), built from `prey` and `predators`.
+        """
+        return self.prey + self.predators
+    
+    def _decide(self, animals: list, perceptions: np.ndarray) -> list:
+        """
+        Decide the actions of a list of animals, one batch per class.
+        
+        Args:
+            animals: Animals to decide for
+            perceptions: Their perceptions, in the same order
+            
+        Returns:
+            The animals' actions, in the same order
+        """
+        batches = {}
+        for i, animal in enumerate(animals):
+            batches.setdefault(type(animal), []).append(i)
+        if len(batches) == 1:
+            cls, = batches
+            return cls.decide(animals, perceptions, self.rng)
+        actions = [None] * len(animals)
+        for cls, indices in batches.items():
+            batch = [animals[i] for i in indices]
+            for i, action in zip(indices, cls.decide(batch, perceptions[indices], self.rng)):
+                actions[i] = action
+        return actions
     
     def next_step(self):
         """Advance the simulation by one step."""
         if self.current_step >= self.max_steps:
             return False
             
-        # Phase 1: Gather perceptions and decide actions
-        actions = []
-        for animal in self.animals:
-            if animal.alive:
-                perception = animal.see(self.ecosystem.map)
-                action = animal.action(perception)
-                actions.append((animal, action))
+        # Phase 1: Gather perceptions (in one batch) and decide actions,
+        # one batch per species
+        prey, predators = self.prey, self.predators
+        perceptions = self.ecosystem.perceive(prey + predators)
+        prey_actions = self._decide(prey, perceptions[:len(prey)])
+        predator_actions = self._decide(predators, perceptions[len(prey):])
         
         # Phase 2: Execute actions
-        new_animals = []
-        dead_animals = []
+        new_prey = []
+        new_predators = []
         
         # Execute predator actions first
-        for animal, action in actions:
-            if isinstance(animal, Predator) and animal.alive:
-                alive, offspring = self.ecosystem.transform(animal, action)
-                if not alive:
-                    dead_animals.append(animal)
-                new_animals.extend(offspring)
+        for animal, action in zip(predators, predator_actions):
+            if animal.alive:
+                _, offspring = self.ecosystem.transform(animal, action)
+                new_predators.extend(offspring)
         
         # Then execute prey actions
-        for animal, action in actions:
-            if isinstance(animal, Prey) and animal.alive:
-                alive, offspring = self.ecosystem.transform(animal, action)
-                if not alive:
-                    dead_animals.append(animal)
-                new_animals.extend(offspring)
+        for animal, action in zip(prey, prey_actions):
+            if animal.alive:
+                _, offspring = self.ecosystem.transform(animal, action)
+                new_prey.extend(offspring)
         
-        # Update animal list
-        self.animals = [a for a in self.animals if a.alive and a not in dead_animals]
-        self.animals.extend(new_animals)
+        # Update animal lists (animals that died have had their alive flag cleared)
+        self.prey = [a for a in prey if a.alive] + new_prey
+        self.predators = [a for a in predators if a.alive] + new_predators
         
         # Regenerate grass
         self.ecosystem.regenerate_grass()
@@ -108,6 +152,4 @@ class Simulation:
     
     def get_population_counts(self):
         """Return current population counts."""
-        prey = sum(1 for a in self.animals if isinstance(a, Prey) and a.alive)
-        predators = sum(1 for a in self.animals if isinstance(a, Predator) and a.alive)
-        return prey, predators
\ No newline at end of file
+        return len(self.prey), len(self.predators)
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+The Numba kernels and their NumPy fallbacks must make the same decisions.
+
+Both implementations of sim.kernels are loaded side by side: the regular
+import (compiled with Numba) and a second copy loaded with
+AIVOLUTION_DISABLE_NUMBA set. The tests are skipped when Numba is not installed;
+tests/test_rules.py checks the decisions themselves with either implementation.
+"""
+
+import importlib.util
+import os
+import unittest
+
+import numpy as np
+
+import sim.kernels as compiled
+from sim.animal import DIR_DRAWS, PERCEPTION_DTYPE
+from sim.cell import ROCK, SOIL
+
+
+def _load_numpy_kernels():
+    """Load a second copy of sim.kernels that uses the NumPy implementations."""
+    spec = importlib.util.spec_from_file_location("sim._numpy_kernels", compiled.__file__)
+    module = importlib.util.module_from_spec(spec)
+    previous = os.environ.get("AIVOLUTION_DISABLE_NUMBA")
+    os.environ["AIVOLUTION_DISABLE_NUMBA"] = "1"
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if previous is None:
+            del os.environ["AIVOLUTION_DISABLE_NUMBA"]
+        else:
+            os.environ["AIVOLUTION_DISABLE_NUMBA"] = previous
+    return module
+
+
+def _random_batch(n: int, seed: int) -> dict:
+    """Random perceptions and animal state covering every rule and threshold edge."""
+    rng = np.random.default_rng(seed)
+    perceptions = np.zeros((n, 3, 3), dtype=PERCEPTION_DTYPE)
+    perceptions["terrain_kind"] = rng.choice([ROCK, SOIL], size=(n, 3, 3))
+    perceptions["n_occ"] = rng.integers(0, 3, size=(n, 3, 3))
+    perceptions["grass"] = rng.choice([0.0, 0.3, 0.5, 0.8, 1.5], size=(n, 3, 3))
+    perceptions["occ_bits"] = rng.integers(0, 4, size=(n, 3, 3))
+    max_energy = rng.choice([80.0, 120.0], size=n)
+    return {
+        "perceptions": perceptions,
+        "energy": rng.choice([0.0, 0.7, 0.9, 1.0], size=n) * max_energy,
+        "max_energy": max_energy,
+        "threshold": max_energy * 0.75,
+        "draws": rng.integers(0, DIR_DRAWS, size=n),
+    }
+
+
+@unittest.skipUnless(compiled.HAVE_NUMBA, "Numba is not installed")
+class TestKernelImplementationsAgree(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.fallback = _load_numpy_kernels()
+        assert not cls.fallback.HAVE_NUMBA
+
+    def _prey_rules(self, kernels, batch):
+        n = len(batch["energy"])
+        out = (np.empty(n, np.int8), np.empty(n, np.int8), np.empty(n, bool), np.empty(n, bool))
+        p = batch["perceptions"]
+        kernels.prey_rules(p["terrain_kind"], p["n_occ"], p["grass"], batch["energy"],
+                           batch["max_energy"], batch["threshold"], batch["draws"], *out)
+        return out
+
+    def _predator_rules(self, kernels, batch):
+        n = len(batch["energy"])
+        out = (np.empty(n, bool), np.empty(n, np.int8), np.empty(n, bool))
+        p = batch["perceptions"]
+        kernels.predator_rules(p["occ_bits"], p["n_occ"], batch["energy"], batch["threshold"], *out)
+        return out
+
+    def test_prey_rules(self):
+        for seed in range(5):
+            batch = _random_batch(2000, seed)
+            expected = self._prey_rules(self.fallback, batch)
+            for name, got, want in zip(("escape", "seek", "eats", "breeds"),
+                                       self._prey_rules(compiled, batch), expected):
+                np.testing.assert_array_equal(got, want, err_msg=f"{name}, seed {seed}")
+
+    def test_predator_rules(self):
+        for seed in range(5):
+            batch = _random_batch(2000, seed)
+            expected = self._predator_rules(self.fallback, batch)
+            for name, got, want in zip(("prey_here", "prey_dirs", "breeds"),
+                                       self._predator_rules(compiled, batch), expected):
+                np.testing.assert_array_equal(got, want, err_msg=f"{name}, seed {seed}")
+
+    def test_gather_perceptions(self):
+        rng = np.random.default_rng(0)
+        rows, cols = 17, 23
+        grid = {
+            "grass": rng.choice([0.0, 0.4, 1.5], size=(rows + 2, cols + 2)),
+            "terrain": rng.choice([ROCK, SOIL], size=(rows + 2, cols + 2)).astype(np.int8),
+            "cell_ids": rng.integers(-1, rows * cols, size=(rows + 2, cols + 2)).astype(np.int32),
+            "occ_count": rng.integers(0, 3, size=(rows + 2, cols + 2)).astype(np.int8),
+            "occ_bits": rng.integers(0, 4, size=(rows + 2, cols + 2)).astype(np.uint8),
+        }
+        centers = (rng.integers(0, rows, size=500), rng.integers(0, cols, size=500))
+        got = np.zeros((500, 3, 3), dtype=PERCEPTION_DTYPE)
+        want = np.zeros((500, 3, 3), dtype=PERCEPTION_DTYPE)
+        compiled.gather_perceptions(got, *grid.values(), *centers)
+        self.fallback.gather_perceptions(want, *grid.values(), *centers)
+        for name in PERCEPTION_DTYPE.names:
+            np.testing.assert_array_equal(got[name], want[name], err_msg=name)
+        
+        # The single-cell kernels fill the same records
+        for kernels in (compiled, self.fallback):
+            one = np.zeros((3, 3), dtype=PERCEPTION_DTYPE)
+            for n in (0, 250, 499):
+                kernels.gather_perception(one, *grid.values(), centers[0][n], centers[1][n])
+                np.testing.assert_array_equal(one, want[n])
+
+    def test_regrow(self):
+        rng = np.random.default_rng(0)
+        fertile = rng.random((40, 60)) < 0.8
+        for cap in (np.inf, 2.0):
+            grass = rng.choice([0.0, 0.5, 1.95, 3.0], size=(40, 60))
+            got, want = grass.copy(), grass.copy()
+            compiled.regrow(got, fertile, 0.1, cap)
+            self.fallback.regrow(want, fertile, 0.1, cap)
+            np.testing.assert_array_equal(got, want, err_msg=f"cap {cap}")
+
+    def test_empty_batch(self):
+        batch = _random_batch(0, 0)
+        for kernels in (compiled, self.fallback):
+            self._prey_rules(kernels, batch)
+            self._predator_rules(kernels, batch)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Prey and Predator decision rules on hand-built perceptions.
+
+These tests go through whichever kernels sim.kernels loaded, so running them
+with AIVOLUTION_DISABLE_NUMBA set checks the NumPy fallbacks.
+"""
+
+import unittest
+
+import numpy as np
+
+from sim.animal import DIR_NAMES, DIRECTIONS, PERCEPTION_DTYPE, PREDATOR_BIT, PREY_BIT
+from sim.cell import Cell, ROCK, SOIL
+from sim.kernels import prey_rules
+from sim.predator import Predator
+from sim.prey import Prey, EAT, MOVE, REPRODUCE
+
+
+def _perception(open_dirs=(), grass=None, center_grass=0.0, center_occ=1, center_bits=0,
+                bits=None) -> np.ndarray:
+    """
+    A (3, 3) perception of a soil cell walled in by rock, except for `open_dirs`.
+
+    Args:
+        open_dirs: Names of the neighbors that are empty soil.
+        grass: Grass amount of some neighbors, by direction name.
+        center_grass: Grass amount of the animal's own cell.
+        center_occ: Number of occupants of the animal's own cell.
+        center_bits: Occupancy bits of the animal's own cell.
+        bits: Occupancy bits of some neighbors, by direction name.
+    """
+    perception = np.zeros((3, 3), dtype=PERCEPTION_DTYPE)
+    perception["terrain_kind"] = ROCK
+    perception["cell_id"] = -1
+    perception[1, 1] = (SOIL, center_grass, center_occ, 0, center_bits)
+    for name in open_dirs:
+        dr, dc = DIRECTIONS[name]
+        perception[1 + dr, 1 + dc]["terrain_kind"] = SOIL
+    for name, amount in (grass or {}).items():
+        dr, dc = DIRECTIONS[name]
+        perception[1 + dr, 1 + dc]["grass"] = amount
+    for name, occ_bits in (bits or {}).items():
+        dr, dc = DIRECTIONS[name]
+        perception[1 + dr, 1 + dc]["occ_bits"] = occ_bits
+        perception[1 + dr, 1 + dc]["n_occ"] = 1
+    return perception
+
+
+def _decide(animal, perception, seed=0):
+    """Decide one animal's action through its class's batched rules."""
+    return type(animal).decide([animal], perception[np.newaxis], np.random.default_rng(seed))[0]
+
+
+class TestPreyRules(unittest.TestCase):
+
+    def test_flees_to_an_open_neighbor(self):
+        prey = Prey()
+        prey.energy = 10.0
+        perception = _perception(open_dirs=("RIGHT", "UP"), center_grass=5.0)
+        perception[0, 1]["n_occ"] = 2  # UP is full
+        for seed in range(20):
+            self.assertEqual(_decide(prey, perception, seed), (MOVE, ("RIGHT",)))
+
+    def test_flee_direction_is_drawn_among_open_neighbors(self):
+        perception = _perception(open_dirs=("UP", "LEFT"))
+        chosen = {_decide(Prey(), perception, seed)[1][0] for seed in range(100)}
+        self.assertEqual(chosen, {"UP", "LEFT"})
+
+    def test_eats_when_hungry(self):
+        prey = Prey()
+        prey.energy = prey.max_energy * 0.5
+        self.assertEqual(_decide(prey, _perception(center_grass=1.0)), (EAT, ()))
+
+    def test_does_not_eat_without_grass_or_hunger(self):
+        prey = Prey()
+        prey.energy = prey.max_energy * 0.5
+        self.assertEqual(_decide(prey, _perception())[0], MOVE)
+        prey.energy = prey.max_energy * 0.7
+        self.assertEqual(_decide(prey, _perception(center_grass=1.0))[0], MOVE)
+
+    def test_reproduces_when_there_is_room(self):
+        prey = Prey()
+        prey.energy = prey.reproduction_threshold
+        self.assertEqual(_decide(prey, _perception()), (REPRODUCE, ()))
+        self.assertEqual(_decide(prey, _perception(center_occ=2))[0], MOVE)
+
+    def test_seeks_the_first_grassy_open_neighbor(self):
+        perception = _perception(open_dirs=("UP", "DOWN", "RIGHT"),
+                                 grass={"UP": 0.5, "DOWN": 0.8, "LEFT": 2.0, "RIGHT": 1.0})
+        perceptions = perception[np.newaxis]
+        out = (np.empty(1, np.int8), np.empty(1, np.int8), np.empty(1, bool), np.empty(1, bool))
+        prey_rules(perceptions["terrain_kind"], perceptions["n_occ"], perceptions["grass"],
+                   np.array([50.0]), np.array([80.0]), np.array([60.0]), np.array([0]), *out)
+        escape, seek, _, _ = out
+        self.assertEqual(DIR_NAMES[seek[0]], "DOWN")
+        self.assertIn(DIR_NAMES[escape[0]], ("UP", "DOWN", "RIGHT"))
+
+
+class TestPredatorRules(unittest.TestCase):
+
+    def test_eats_prey_in_its_cell(self):
+        cell = Cell()
+        predator, prey = Predator(cell), Prey(cell)
+        cell.add_animal(predator)
+        cell.add_animal(prey)
+        perception = _perception(center_occ=2, center_bits=PREY_BIT | PREDATOR_BIT,
+                                 bits={"LEFT": PREY_BIT})
+        self.assertEqual(_decide(predator, perception), (EAT, (prey,)))
+
+    def test_hunts_adjacent_prey(self):
+        predator = Predator()
+        predator.energy = predator.reproduction_threshold
+        perception = _perception(bits={"LEFT": PREY_BIT, "DOWN": PREY_BIT, "UP": PREDATOR_BIT})
+        chosen = {_decide(predator, perception, seed) for seed in range(100)}
+        self.assertEqual(chosen, {(MOVE, ("LEFT",)), (MOVE, ("DOWN",))})
+
+    def test_hunts_next_door_when_the_prey_here_is_dead(self):
+        cell = Cell()
+        predator, prey = Predator(cell), Prey(cell)
+        cell.add_animal(predator)
+        cell.add_animal(prey)
+        prey.alive = False
+        perception = _perception(center_occ=2, center_bits=PREY_BIT | PREDATOR_BIT,
+                                 bits={"RIGHT": PREY_BIT})
+        self.assertEqual(_decide(predator, perception), (MOVE, ("RIGHT",)))
+
+    def test_reproduces_without_prey_around(self):
+        predator = Predator()
+        predator.energy = predator.reproduction_threshold
+        self.assertEqual(_decide(predator, _perception()), (REPRODUCE, ()))
+        self.assertEqual(_decide(predator, _perception(center_occ=2))[0], MOVE)
+
+    def test_moves_randomly_otherwise(self):
+        predator = Predator()
+        predator.energy = 10.0
+        chosen = {_decide(predator, _perception(), seed) for seed in range(100)}
+        self.assertEqual(chosen, {(MOVE, (name,)) for name in DIR_NAMES})
+
+
+if __name__ == "__main__":
+    unittest.main()
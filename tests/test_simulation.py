@@ -0,0 +1,77 @@
+"""
+Simulation-level invariants: the ecosystem's occupancy arrays and initial placement.
+"""
+
+import unittest
+
+import numpy as np
+
+from sim.simulation import Simulation
+
+
+def _occupancy_from_cells(ecosystem) -> tuple:
+    """Occupant counts and species bits recomputed from the cells' occupant lists."""
+    count = np.zeros((ecosystem.rows, ecosystem.cols), dtype=int)
+    bits = np.zeros((ecosystem.rows, ecosystem.cols), dtype=int)
+    for cell in ecosystem.cells_flat:
+        count[cell.row, cell.col] = len(cell.occupants)
+        for occupant in cell.occupants:
+            bits[cell.row, cell.col] |= occupant.occupancy_bit
+    return count, bits
+
+
+class TestOccupancyArrays(unittest.TestCase):
+
+    def assertOccupancyInSync(self, ecosystem, msg=None):
+        count, bits = _occupancy_from_cells(ecosystem)
+        np.testing.assert_array_equal(ecosystem.occ_count, count, err_msg=f"occ_count {msg}")
+        np.testing.assert_array_equal(ecosystem.occ_bits, bits, err_msg=f"occ_bits {msg}")
+
+    def test_in_sync_through_a_run(self):
+        # Moves, kills, deaths and births all happen within these steps
+        sim = Simulation(size=15, initial_prey=60, initial_predators=20, seed=7)
+        self.assertOccupancyInSync(sim.ecosystem, "after placement")
+        for step in range(60):
+            sim.next_step()
+            self.assertOccupancyInSync(sim.ecosystem, f"after step {step}")
+
+    def test_in_sync_through_remove_and_clear(self):
+        sim = Simulation(size=10, initial_prey=30, initial_predators=10, seed=1)
+        eco = sim.ecosystem
+        for cell in eco.cells_flat:
+            if len(cell.occupants) == 2:
+                cell.remove_animal(cell.occupants[0])
+                self.assertOccupancyInSync(eco, "after remove_animal")
+        for cell in eco.cells_flat:
+            cell.clear_occupants()
+        self.assertOccupancyInSync(eco, "after clear_occupants")
+        self.assertFalse(eco.occ_count.any())
+
+
+class TestInitialPlacement(unittest.TestCase):
+
+    def test_too_many_animals_raise(self):
+        # 25 soil cells hold at most 50 animals
+        with self.assertRaises(ValueError):
+            Simulation(size=5, initial_prey=40, initial_predators=11, rock_density=0.0, seed=0)
+
+    def test_a_full_grid_can_be_placed(self):
+        sim = Simulation(size=5, initial_prey=40, initial_predators=10, rock_density=0.0, seed=0)
+        self.assertTrue((sim.ecosystem.occ_count == 2).all())
+
+    def test_animals_land_on_soil_with_at_most_two_per_cell(self):
+        for seed in range(10):
+            sim = Simulation(size=8, initial_prey=40, initial_predators=15, rock_density=0.4,
+                             seed=seed)
+            self.assertEqual(sim.get_population_counts(), (40, 15))
+            for animal in sim.animals:
+                self.assertTrue(animal.position.is_fertile())
+                self.assertTrue(any(o is animal for o in animal.position.occupants))
+            for cell in sim.ecosystem.cells_flat:
+                self.assertLessEqual(len(cell.occupants), 2)
+                if not cell.is_fertile():
+                    self.assertEqual(cell.occupants, [])
+
+
+if __name__ == "__main__":
+    unittest.main()